@@ -2,11 +2,14 @@
 # Licensed under the General Public License, Version 3.0, see LICENSE for details.
 # SPDX-License-Identifier: GPL-3.0-only
 
-import copy
+import functools
+import hashlib
 import json
 import multiprocessing as mp
 import os
 import re
+import select
+import shutil
 import signal
 import subprocess
 import sys
@@ -20,143 +23,206 @@ root_path_to_verismith = sys.argv[3]
 from pathlib import Path
 def find_file_in_subdirectories(root_dir, filename):
     root_path = Path(root_dir)
-    matches = []
-    for path in root_path.rglob(filename):
-        matches.append(path)
-    assert len(matches) == 1, f"Expected to find exactly one file with name {filename} in the subdirectories of {root_dir}, but found {len(matches)} files."
-    return matches[0]
-path_to_verismith = find_file_in_subdirectories(root_path_to_verismith, "verismith")
+    # Stop the walk at the first executable file with this name, skipping directories and other files with the same name
+    match = next((path for path in root_path.rglob(filename) if path.is_file() and os.access(path, os.X_OK)), None)
+    assert match is not None, f"Expected to find an executable file with name {filename} in the subdirectories of {root_dir}, but found none."
+    return match
+# Set VERISMITH_BIN (e.g., in CI) to skip the directory walk. The resolved path is stored there so that child processes reuse it.
+if "VERISMITH_BIN" not in os.environ:
+    os.environ["VERISMITH_BIN"] = str(find_file_in_subdirectories(root_path_to_verismith, "verismith"))
+path_to_verismith = Path(os.environ["VERISMITH_BIN"])
+
+# Snapshot of the environment, extended per Yosys call instead of copying os.environ each time
+__BASE_ENV = dict(os.environ)
 
 MAX_NUM_CELLS = 10000
 TIMEOUT_SECONDS = 5 # Might change to 900 like in the original paper
 
-TMP_DIR = "tmp"
+# Intermediate files are written and read back by Yosys for every design, so keep them in memory when tmpfs is available.
+# Set MIRTL_TMP_DIR to use another directory, e.g., when /dev/shm is small, as in Docker builds where it is limited to 64 MiB by default.
+if "MIRTL_TMP_DIR" in os.environ:
+    TMP_DIR = os.environ["MIRTL_TMP_DIR"]
+else:
+    TMP_DIR = os.path.join("/dev/shm", f"mirtl_tmp_{os.getpid()}") if os.path.exists("/dev/shm") else "tmp"
+# Large buffer for the design files, so that they are written with few system calls
+WRITE_BUFFER_SIZE = 1 << 20
 os.makedirs(TMP_DIR, exist_ok=True)
 os.makedirs(os.path.join(TMP_DIR, "designs"), exist_ok=True)
 os.makedirs(os.path.join(TMP_DIR, "prepared_for_equiv"), exist_ok=True)
 os.makedirs(os.path.join(TMP_DIR, "logs"), exist_ok=True)
 
-# Generates a list of modules
-def gen_design():
+# Generates a list of modules into design_filepath and returns the design bytes and their hash
+def gen_design(design_filepath):
     # Generate a design using the command `cabal run verismith generate`
-    design = subprocess.run([f"{path_to_verismith} generate"], shell=True, stdout=subprocess.PIPE).stdout.decode('utf-8')
-    return design
-
-def synthesize_design(verilog_input_filepath, verilog_output_filepath, log_name):
-    # Modify the environment
-    curr_env = os.environ.copy()
-    curr_env["VERILOG_INPUT"] = verilog_input_filepath
-    curr_env["VERILOG_OUTPUT"] = verilog_output_filepath
-    curr_env["TOP_MODULE"] = "top"
-
-    # Copy the verilog file to the output file
-    subprocess.run([f"yosys -c synthesize.ys.tcl -l {log_name}"], shell=True, env=curr_env, stdout=subprocess.PIPE)
+    # The output is streamed to the file and hashed on the fly. The bytes are kept so that check_equiv does not need to read the file back.
+    design_hasher = hashlib.blake2b(digest_size=8) # Deterministic across worker processes, unlike the salted built-in hash()
+    design_chunks = []
+    with open(design_filepath, "wb", buffering=WRITE_BUFFER_SIZE) as f, subprocess.Popen([str(path_to_verismith), "generate"], stdout=subprocess.PIPE) as process:
+        for chunk in iter(lambda: process.stdout.read(1 << 16), b""):
+            f.write(chunk)
+            design_hasher.update(chunk)
+            design_chunks.append(chunk)
+    # Exiting the Popen context waits for Verismith. A failed run may have produced a partial design, which must not be deduplicated or synthesized.
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+    return b"".join(design_chunks), design_hasher.hexdigest()
+
+# Each worker keeps a persistent Yosys process running a Tcl shell, so that the Yosys startup is paid once per worker rather than once per design
+__yosys_process = None
+YOSYS_DONE_SENTINEL = "===DONE==="
+YOSYS_STARTUP_TIMEOUT_SECONDS = 60
+
+def __get_yosys_process():
+    global __yosys_process
+    # (Re)start the process if it was never started or if it died, e.g., on a Yosys error
+    if __yosys_process is None or __yosys_process.poll() is not None:
+        # With -q, Yosys only prints warnings and errors, to stderr. Only those are logged, as the full output of every design would fill TMP_DIR.
+        log_name = os.path.join(TMP_DIR, "logs", f"yosys_{os.getpid()}.log")
+        with open(log_name, "a") as log_file:
+            __yosys_process = subprocess.Popen(["yosys", "-q", "-C"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=log_file, text=True)
+        # Fail early and loudly, rather than hanging, if this Yosys cannot run a Tcl shell that reads its commands from a pipe
+        __yosys_process.stdin.write(f"puts {YOSYS_DONE_SENTINEL}; flush stdout\n")
+        __yosys_process.stdin.flush()
+        ready, _, _ = select.select([__yosys_process.stdout], [], [], YOSYS_STARTUP_TIMEOUT_SECONDS)
+        if not ready or __yosys_process.stdout.readline().strip() != YOSYS_DONE_SENTINEL:
+            __yosys_process.kill()
+            __yosys_process.wait()
+            raise Exception(f"The persistent Yosys Tcl shell (yosys -q -C) exited or did not respond within {YOSYS_STARTUP_TIMEOUT_SECONDS} seconds. Check that Yosys is built with Tcl support, and see {log_name}.")
+    return __yosys_process
+
+# Sources the Tcl script in the persistent Yosys process of the worker and waits for it to complete
+def run_in_persistent_yosys(tcl_script, env_vars):
+    process = __get_yosys_process()
+    # The scripts read their parameters from the environment
+    commands = [f"set ::env({var_name}) {{{var_value}}}" for var_name, var_value in env_vars.items()]
+    commands.append(f"source {tcl_script}")
+    # Sent as a separate command so that it is printed even if the script fails
+    commands.append(f"puts {YOSYS_DONE_SENTINEL}; flush stdout")
+    process.stdin.write("\n".join(commands) + "\n")
+    process.stdin.flush()
+    # With -q, Yosys does not log to stdout, so stdout only carries the sentinel
+    for line in process.stdout:
+        if line.strip() == YOSYS_DONE_SENTINEL:
+            return
+    raise Exception(f"The persistent Yosys process exited while running {tcl_script} with {env_vars}")
+
+# Returns the number of cells of the design and the ports of its top module. The parsed design is kept in the persistent Yosys process for synthesize_parsed_design.
+def get_num_cells_and_ports(verilog_input_filepath, stats_filepath, ports_filepath):
+    run_in_persistent_yosys("stat_and_ports.ys.tcl", {
+        "VERILOG_INPUT": verilog_input_filepath,
+        "STATS_OUTPUT": stats_filepath,
+        "PORTS_OUTPUT": ports_filepath,
+        "TOP_MODULE": "top",
+    })
+    if not os.path.exists(stats_filepath) or not os.path.exists(ports_filepath):
+        raise Exception(f"Could not find the stats or the ports for filepath: {verilog_input_filepath}")
+    with open(stats_filepath, "r") as f:
+        stats = f.read()
+    with open(ports_filepath, "r") as f:
+        ports = json.load(f)["modules"]["top"]["ports"]
+    return __get_num_cells_from_stats(stats, verilog_input_filepath), ports
+
+# Synthesizes the design last passed to get_num_cells_and_ports, without parsing it again
+def synthesize_parsed_design(verilog_input_filepath, verilog_output_filepath):
+    run_in_persistent_yosys("synth_parsed.ys.tcl", {
+        "VERILOG_OUTPUT": verilog_output_filepath,
+    })
+    if not os.path.exists(verilog_output_filepath):
+        raise Exception(f"Could not find the synthesized design for filepath: {verilog_input_filepath}")
 
 # The modules generated by Verismith, except the top module, have names like module\d+
-def rename_all_verismith_modules(verilog_str):
+__MOD_RE = re.compile(rb"(module\d+)")
+def rename_all_verismith_modules(verilog_bytes):
     # append all module\d+ with module\d+_replacedname
-    return re.sub(r"(module\d+)", r"\1_replacedname", verilog_str)
+    return __MOD_RE.sub(rb"\1_replacedname", verilog_bytes)
 
-def __get_num_cells(design_filepath):
-    # We use Yosys for this.
-    curr_env = os.environ.copy()
-    curr_env["VERILOG_INPUT"] = design_filepath
-    curr_env["TOP_MODULE"] = "top"
+def __get_num_cells_from_stats(stats, design_filepath):
+    # Find the last occurrence of `Number of cells:`, starting from behind
+    stats_lines = list(map(lambda s: s.strip(), stats.split("\n")))
+    for line_id in range(len(stats_lines) - 1, -1, -1):
+        if stats_lines[line_id].startswith("Number of cells:"):
+            return int(stats_lines[line_id].split(":")[1].strip())
 
-    stdout = subprocess.run(f"yosys -c stats.ys.tcl", shell=True, env=curr_env, stdout=subprocess.PIPE).stdout.decode('utf-8')
+    raise Exception(f"Could not find the number of cells in the stats for filepath: {design_filepath}")
 
-    # Find the last occurrence of `Number of cells:`, starting from behind
-    stdout_lines = list(map(lambda s: s.strip(), stdout.split("\n")))
-    for line_id in range(len(stdout_lines) - 1, -1, -1):
-        if stdout_lines[line_id].startswith("Number of cells:"):
-            return int(stdout_lines[line_id].split(":")[1].strip())
+# Returns the declaration of a port described by the JSON backend of Yosys, with the given name
+def __port_declaration(port, port_name):
+    width = len(port["bits"])
+    offset = port.get("offset", 0)
+    port_range = f"[{offset}:{offset + width - 1}]" if port.get("upto", 0) else f"[{offset + width - 1}:{offset}]"
+    signed = " signed" if port.get("signed", 0) else ""
+    return f"{port['direction']} wire{signed} {port_range} {port_name};"
+
+# Equivalence checking process currently run by this worker, if any
+__equiv_process = None
+
+def __kill_process_group(process):
+    try:
+        # The process group id is the pid of the process, because of start_new_session
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+# The pool terminates its workers with SIGTERM, e.g., when a task raised an exception.
+def __on_sigterm(signum, frame):
+    if __equiv_process is not None:
+        __kill_process_group(__equiv_process)
+    raise SystemExit(1)
 
-    raise Exception(f"Could not find the number of cells in the stdout for filepath: {design_filepath}")
+# Paths of the files prepared by check_equiv for the first design, the second design and the top module
+def get_equiv_filepaths(design_hash):
+    return tuple(os.path.join(TMP_DIR, "prepared_for_equiv", f"equiv_{design_hash}_{suffix}.v") for suffix in ("0", "1", "top"))
 
 # Return True iff equivalent
-def check_equiv(first_filepath, second_filepath):
+# first_design holds the bytes of the first design, which are already in memory, so that it is not read back from disk
+# ports are the ports of the top module of the first design, as reported by Yosys
+def check_equiv(first_design, second_filepath, design_hash, ports):
+    target_first_filepath, target_second_filepath, target_top_filepath = get_equiv_filepaths(design_hash)
     # Replace the top module name in the verilog files
-    with open(first_filepath, "r") as f:
-        first_verilog = f.read()
-    with open(second_filepath, "r") as f:
-        second_verilog = f.read()
-    design_hash = hex(abs(hash(first_verilog)))[2:]
-    target_first_filepath = os.path.join(TMP_DIR, "prepared_for_equiv", f"equiv_{design_hash}_0.v")
-    first_file_transformed_content = first_verilog.replace("module top", "module top_first")
-    del first_verilog
-    with open(target_first_filepath, "w") as f:
-        f.write(first_file_transformed_content)
-    target_second_filepath = os.path.join(TMP_DIR, "prepared_for_equiv", f"equiv_{design_hash}_1.v")
+    with open(target_first_filepath, "wb") as f:
+        f.write(first_design.replace(b"module top", b"module top_first"))
+
     # Also rename the modules of the second file
-    second_file_transformed_content = rename_all_verismith_modules(second_verilog)
-    del second_verilog
-    second_file_transformed_content = second_file_transformed_content.replace("module top", "module top_second")
-    with open(target_second_filepath, "w") as f:
+    with open(second_filepath, "rb") as f:
+        second_file_transformed_content = rename_all_verismith_modules(f.read())
+    second_file_transformed_content = second_file_transformed_content.replace(b"module top", b"module top_second")
+    with open(target_second_filepath, "wb") as f:
         f.write(second_file_transformed_content)
+    del second_file_transformed_content
 
-    # Find the input wires in the top of the first
-    # First, find the module top_first
-    first_file_lines = first_file_transformed_content.split("\n")
-    top_first_line_id = None
-    for i, line in enumerate(first_file_lines):
-        if line.strip().startswith("module top_first"):
-            top_first_line_id = i
-            break
-    # Until a line that starts with endmodule, find all wires that are inputs
-    input_wire_lines = []
-    for line in first_file_lines[top_first_line_id:]:
-        stripped_line = line.strip()
-        if stripped_line.startswith("endmodule"):
-            break
-        if stripped_line.startswith("input"):
-            input_wire_lines.append(line.strip())
-
-    
-    input_wire_dimensions = []
-    input_wire_names = []
-    for input_line in input_wire_lines:
-        # Find the name of the wire
-        splitted_line = input_line.split(" ")
-        wire_dimensions = copy.copy(splitted_line[:-1])
-        wire_name = splitted_line[-1][:-1] # The last [:-1] is to remove the semicolon
-        input_wire_dimensions.append(wire_dimensions)
-        input_wire_names.append(wire_name)
-
-    # Also get the output wire
-    output_wire_line_id = None
-    for i, line in enumerate(first_file_lines):
-        if line.strip().startswith("output wire"):
-            output_wire_line_id = i
-            break
-    assert output_wire_line_id is not None, f"Could not find the output wire line in the first file {target_first_filepath}"
-
-    output_wire_line = first_file_lines[output_wire_line_id].strip()
-    assert output_wire_line.startswith("output wire") and output_wire_line.endswith("y;"), f"Output wire line is {output_wire_line} but should be 'output wire ... y;"
+    input_wire_names = [port_name for port_name, port in ports.items() if port["direction"] == "input"]
+    input_wire_lines = [__port_declaration(ports[port_name], port_name) for port_name in input_wire_names]
+    assert "y" in ports and ports["y"]["direction"] == "output", f"Expected an output port y in the first file {target_first_filepath}, but found ports {list(ports)}"
 
     # Create the new toplevel
     new_top_lines = []
     new_top_lines.append(f"module top_equiv (y_a, y_b, {', '.join(input_wire_names)});")
-    new_top_lines.append(output_wire_line.replace('y;', 'y_a;'))
-    new_top_lines.append(output_wire_line.replace('y;', 'y_b;'))
+    new_top_lines.append(__port_declaration(ports["y"], "y_a"))
+    new_top_lines.append(__port_declaration(ports["y"], "y_b"))
     new_top_lines += input_wire_lines
     new_top_lines.append(f"top_first top_first_inst (.y(y_a), {', '.join(map(lambda s: '.'+s, input_wire_names))});")
     new_top_lines.append(f"top_second top_second_inst (.y(y_b), {', '.join(map(lambda s: '.'+s, input_wire_names))});")
     new_top_lines.append("endmodule")
 
-    target_top_filepath = os.path.join(TMP_DIR, "prepared_for_equiv", f"equiv_{design_hash}_top.v")
-    with open(target_top_filepath, "w") as f:
-        f.write("\n".join(new_top_lines))
+    with open(target_top_filepath, "wb") as f:
+        f.write("\n".join(new_top_lines).encode())
 
-    curr_env = os.environ.copy()
-    curr_env["VERILOG_INPUT_FIRST"]  = target_first_filepath
-    curr_env["VERILOG_INPUT_SECOND"] = target_second_filepath
-    curr_env["VERILOG_INPUT_TOP"]    = target_top_filepath
+    curr_env = {
+        **__BASE_ENV,
+        "VERILOG_INPUT_FIRST":  target_first_filepath,
+        "VERILOG_INPUT_SECOND": target_second_filepath,
+        "VERILOG_INPUT_TOP":    target_top_filepath,
+    }
 
-    cmd = f"yosys -c equivtest.ys.tcl"
+    cmd = ["yosys", "-c", "equivtest.ys.tcl"]
 
     # Measurement
 
-    process = subprocess.Popen([cmd], shell=True, stdout=subprocess.PIPE, env=curr_env, stderr=subprocess.PIPE)
+    # Yosys runs in its own process group, so that the timeout can kill it together with any process it spawned.
+    # Being out of the foreground process group, it does not receive Ctrl-C, so it must also be killed if this worker is interrupted or terminated.
+    global __equiv_process
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, env=curr_env, stderr=subprocess.PIPE, start_new_session=True)
+    __equiv_process = process
 
     start_time = time.time()
     try:
@@ -165,51 +231,111 @@ def check_equiv(first_filepath, second_filepath):
         end_time = time.time()
         return end_time - start_time
     except subprocess.TimeoutExpired:
-        # If timeout occurs, kill the process using SIGKILL
+        # If timeout occurs, kill the process group using SIGKILL and reap the process
         print("TIMEOUT!")
-        os.kill(process.pid, signal.SIGKILL)
+        __kill_process_group(process)
+        process.communicate()
         print(f"Process killed after {TIMEOUT_SECONDS} seconds timeout.")
         return None
+    except BaseException:
+        # E.g., KeyboardInterrupt, or SystemExit raised by __on_sigterm
+        __kill_process_group(process)
+        raise
+    finally:
+        __equiv_process = None
 
 manager = mp.Manager()
-lock = manager.Lock()
-set_of_design_hashes = manager.list()
+# Used as a set. Each proxy call is executed atomically by the manager, so setdefault acts as an atomic test-and-insert and no lock is needed.
+set_of_design_hashes = manager.dict()
 
-def test_new_design(set_of_design_hashes, lock, workload_id):
+def test_new_design(set_of_design_hashes, workload_id):
     num_cells = None
+    attempt_id = 0
     while num_cells is None or num_cells > MAX_NUM_CELLS:
-        design = gen_design()
-        design_hash = f"{hex(abs(hash(design)))[2:]:0>16}"
-        with lock:
-            if design_hash in set_of_design_hashes:
-                print(f"Skipping duplicate design with hash {design_hash}")
-                continue
-            set_of_design_hashes.append(design_hash)
+        # The design is renamed after its hash once the hash is known
+        path_to_new_design = os.path.join(TMP_DIR, "designs", f"design_{workload_id}_new.v")
+        design, design_hash = gen_design(path_to_new_design)
+        attempt_id += 1
+        # If another attempt already inserted this hash, setdefault returns its token instead of ours
+        if set_of_design_hashes.setdefault(design_hash, (workload_id, attempt_id)) != (workload_id, attempt_id):
+            print(f"Skipping duplicate design with hash {design_hash}")
+            continue
 
         path_to_design = os.path.join(TMP_DIR, "designs", f"design_{workload_id}_{design_hash}.v")
-        with open(path_to_design, "w") as f:
-            f.write(design)
-        num_cells = __get_num_cells(path_to_design)
-
-    # Synthesize the design
+        os.replace(path_to_new_design, path_to_design)
+
+        # Count the cells and get the ports. The design stays parsed in the persistent Yosys process.
+        path_to_stats = os.path.join(TMP_DIR, "logs", f"stats_{workload_id}_{design_hash}.log")
+        path_to_ports = os.path.join(TMP_DIR, "logs", f"ports_{workload_id}_{design_hash}.json")
+        num_cells, ports = get_num_cells_and_ports(path_to_design, path_to_stats, path_to_ports)
+        if num_cells > MAX_NUM_CELLS:
+            # The files of rejected designs are not needed anymore, so do not let them fill TMP_DIR
+            for path in (path_to_design, path_to_stats, path_to_ports):
+                os.remove(path)
+
+    # Synthesize the design, which is only done for the designs that are within MAX_NUM_CELLS
     path_to_design_synthesized = os.path.join(TMP_DIR, "designs", f"design_synthesized_{workload_id}_{design_hash}.v")
-    synthesize_design(path_to_design, path_to_design_synthesized, os.path.join(TMP_DIR, "logs", f"synth_{workload_id}_{design_hash}.log"))
+    synthesize_parsed_design(path_to_design, path_to_design_synthesized)
 
-    check_duration = check_equiv(path_to_design, path_to_design_synthesized)
+    check_duration = check_equiv(design, path_to_design_synthesized, design_hash, ports)
     if check_duration is not None:
         print(f"check_duration: {check_duration: >7.2f}, num_cells: {num_cells:>4}, hash: {design_hash}")
     else:
         print(f"check_duration: TIMEOUT, num_cells: {num_cells:>4}, hash: {design_hash}")
         # check_duration:>4.f}, num_cells: {num_cells:>4}, hash: {design_hash}")
+
+    # The files of this workload are not needed anymore, so do not let them fill TMP_DIR
+    for path in (path_to_design, path_to_design_synthesized, path_to_stats, path_to_ports, *get_equiv_filepaths(design_hash)):
+        os.remove(path)
+
     if check_duration is None:
         check_duration = TIMEOUT_SECONDS
     return num_cells, check_duration
 
-with mp.Pool(processes=num_processes) as pool:
-    results = pool.starmap(test_new_design, ((set_of_design_hashes, lock, i) for i in range(num_workloads)))
-
-# Remove the temporary directory
-subprocess.run([f"rm -rf {TMP_DIR}"], shell=True)
-
+def __is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+# Pins each pool worker to its own core. The Yosys processes spawned by the worker inherit the affinity.
+# worker_slots holds the PID of the worker that owns each slot of the pool, 0 if none. A worker that replaces a dead one takes over its slot, and hence its core.
+def __pin_worker(worker_slots):
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    available_cores = sorted(os.sched_getaffinity(0))
+    # With more workers than cores, pinned workers would share cores while others idle, which inflates the measured durations. Let the scheduler balance them instead.
+    if len(worker_slots) > len(available_cores):
+        return
+    with worker_slots.get_lock():
+        worker_id = next(slot_id for slot_id, pid in enumerate(worker_slots) if pid == 0 or not __is_process_alive(pid))
+        worker_slots[worker_id] = os.getpid()
+    os.sched_setaffinity(0, {available_cores[worker_id]})
+
+def __init_worker(worker_slots):
+    signal.signal(signal.SIGTERM, __on_sigterm)
+    __pin_worker(worker_slots)
+
+# Partial results, one JSON line per design, so that they survive an interrupted run
+PARTIAL_RESULTS_PATH = "performance_results.jsonl"
+
+def __append_jsonl(f, result):
+    f.write(json.dumps(result) + "\n")
+    f.flush()
+
+# Results are collected as soon as each design completes, so that fast workers are not held back by stragglers
+results = []
+worker_slots = mp.Array('i', num_processes)
+try:
+    with mp.Pool(processes=num_processes, initializer=__init_worker, initargs=(worker_slots,)) as pool, open(PARTIAL_RESULTS_PATH, "w") as partial_results_file:
+        for result in pool.imap_unordered(functools.partial(test_new_design, set_of_design_hashes), range(num_workloads), chunksize=1):
+            results.append(result)
+            __append_jsonl(partial_results_file, result)
+finally:
+    # Remove the temporary directory, also if a worker failed or the run was interrupted, as it may be in memory
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+# Encoded in one go and written with a single call
 with open("performance_results.json", "w") as f:
-    json.dump(results, f)
+    f.write(json.dumps(results, separators=(',', ':')))
@@ -20,12 +20,14 @@ root_path_to_verismith = sys.argv[3]
 from pathlib import Path
 def find_file_in_subdirectories(root_dir, filename):
     root_path = Path(root_dir)
-    matches = []
-    for path in root_path.rglob(filename):
-        matches.append(path)
-    assert len(matches) == 1, f"Expected to find exactly one file with name {filename} in the subdirectories of {root_dir}, but found {len(matches)} files."
-    return matches[0]
-path_to_verismith = find_file_in_subdirectories(root_path_to_verismith, "verismith")
+    # Stop the walk at the first executable file with this name, skipping directories and other files with the same name
+    match = next((path for path in root_path.rglob(filename) if path.is_file() and os.access(path, os.X_OK)), None)
+    assert match is not None, f"Expected to find an executable file with name {filename} in the subdirectories of {root_dir}, but found none."
+    return match
+# Set VERISMITH_BIN (e.g., in CI) to skip the directory walk. The resolved path is stored there so that child processes reuse it.
+if "VERISMITH_BIN" not in os.environ:
+    os.environ["VERISMITH_BIN"] = str(find_file_in_subdirectories(root_path_to_verismith, "verismith"))
+path_to_verismith = Path(os.environ["VERISMITH_BIN"])
 
 # Create the directory if it does not already exist
 os.makedirs(target_dirpath, exist_ok=True)
@@ -0,0 +1,31 @@
+# Copyright 2024 Flavien Solt, ETH Zurich.
+# Licensed under the General Public License, Version 3.0, see LICENSE for details.
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Stats flow of stats.ys.tcl, plus the ports of the top module.
+# Unlike stats.ys.tcl, hierarchy runs with -check, as the parsed design is shared with the synthesis flow, which used it.
+# The parsed design is saved as `parsed` so that synth_parsed.ys.tcl can synthesize it without parsing it again.
+# Meant to be sourced repeatedly by a persistent Yosys Tcl shell, hence the design reset.
+
+if { [info exists ::env(VERILOG_INPUT)] }    { set VERILOG_INPUT $::env(VERILOG_INPUT) }       else { puts "Please set VERILOG_INPUT environment variable"; exit 1 }
+if { [info exists ::env(STATS_OUTPUT)] }     { set STATS_OUTPUT $::env(STATS_OUTPUT) }         else { puts "Please set STATS_OUTPUT environment variable"; exit 1 }
+if { [info exists ::env(PORTS_OUTPUT)] }     { set PORTS_OUTPUT $::env(PORTS_OUTPUT) }         else { puts "Please set PORTS_OUTPUT environment variable"; exit 1 }
+if { [info exists ::env(TOP_MODULE)] }       { set TOP_MODULE $::env(TOP_MODULE) }             else { puts "Please set TOP_MODULE environment variable"; exit 1 }
+
+yosys design -reset
+yosys read_verilog -sv $VERILOG_INPUT
+yosys hierarchy -top $TOP_MODULE -check
+yosys design -save parsed
+
+# Stats, as in stats.ys.tcl
+yosys memory
+yosys proc
+yosys opt_clean
+
+# Ports of the top module, used to build the equivalence checking wrapper.
+# The JSON backend rejects modules with processes, so this must come after proc. The passes above do not change the ports.
+yosys select $TOP_MODULE/x:*
+yosys write_json -selected $PORTS_OUTPUT
+yosys select -clear
+
+yosys tee -o $STATS_OUTPUT stat -width
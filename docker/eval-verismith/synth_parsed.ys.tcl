@@ -0,0 +1,14 @@
+# Copyright 2024 Flavien Solt, ETH Zurich.
+# Licensed under the General Public License, Version 3.0, see LICENSE for details.
+# SPDX-License-Identifier: GPL-3.0-only
+
+# Synthesis flow formerly in synthesize.ys.tcl (proc, opt -purge), on the design saved as `parsed` by stat_and_ports.ys.tcl in the same Yosys process.
+# That design was read without -defer, so its modules are elaborated at read time rather than by hierarchy.
+
+if { [info exists ::env(VERILOG_OUTPUT)] }   { set VERILOG_OUTPUT $::env(VERILOG_OUTPUT) }     else { puts "Please set VERILOG_OUTPUT environment variable"; exit 1 }
+
+yosys design -load parsed
+yosys proc
+yosys opt -purge
+
+yosys write_verilog -sv -noattr $VERILOG_OUTPUT